@@ -1,9 +1,10 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
+from .replica import RoutingSession, engine_options, init_replica
 
 # Initialize SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def create_app():
@@ -12,9 +13,50 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
         "DATABASE_URL", "sqlite:///local.db"
     )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"], "DB"
+    )
+    app.config["REPLICA_DATABASE_URI"] = os.getenv("DATABASE_REPLICA_URL")
+    if app.config["REPLICA_DATABASE_URI"]:
+        app.config["REPLICA_ENGINE_OPTIONS"] = engine_options(
+            app.config["REPLICA_DATABASE_URI"],
+            "REPLICA",
+            fallback="DB",
+            connect_timeout=2,
+        )
+    app.config["REPLICA_MAX_LAG_SECONDS"] = float(
+        os.getenv("REPLICA_MAX_LAG_SECONDS", 30)
+    )
+    app.config["REPLICA_LAG_CHECK_SECONDS"] = float(
+        os.getenv("REPLICA_LAG_CHECK_SECONDS", 5)
+    )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SSE_HEARTBEAT_SECONDS"] = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    app.config["SSE_MAX_SUBSCRIBERS"] = int(os.getenv("SSE_MAX_SUBSCRIBERS", 1000))
+    app.config["SSE_BACKLOG_PAGE_SIZE"] = int(os.getenv("SSE_BACKLOG_PAGE_SIZE", 500))
+    app.config["BATCH_QUERY_MAX_ITEMS"] = int(os.getenv("BATCH_QUERY_MAX_ITEMS", 500))
+
+    app.config["PROFILE_SLOW_REQUEST_MS"] = float(
+        os.getenv("PROFILE_SLOW_REQUEST_MS", 500)
+    )
+    app.config["PROFILE_SLOW_QUERY_MS"] = float(os.getenv("PROFILE_SLOW_QUERY_MS", 100))
+    app.config["PROFILE_SAMPLE_RATE"] = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    app.config["PROFILE_SAMPLE_INTERVAL_MS"] = float(
+        os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)
+    )
+    app.config["PROFILE_TIMING_HEADERS"] = (
+        os.getenv("PROFILE_TIMING_HEADERS", "false").lower() == "true"
+    )
+    app.config["PROFILE_HEADER_ENABLED"] = (
+        os.getenv("PROFILE_HEADER_ENABLED", "false").lower() == "true"
+    )
+    app.config["PROFILE_DIR"] = os.getenv("PROFILE_DIR", "/tmp/profiles")
 
     db.init_app(app)
+    init_replica(app)
+
+    from .profiling import init_profiling
+    init_profiling(app)
 
     from .routes import bp as main_bp
     app.register_blueprint(main_bp)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import psycopg
+from sqlalchemy import select, func
+from sqlalchemy.engine import make_url
+from . import db
+from .models import Trade, ComplianceAlert
+
+ALERT_CHANNEL = "compliance_alerts"
+
+
+def alert_event(alert: ComplianceAlert, trade: Trade) -> Dict:
+    """Serializes an alert and its trade into the payload pushed to subscribers."""
+    return {
+        "id": alert.id,
+        "trade_date": trade.trade_date.isoformat(),
+        "account": trade.account,
+        "ticker": trade.ticker,
+        "rule": alert.rule_name,
+        "severity": alert.severity,
+        "description": alert.description,
+        "triggered": True,
+    }
+
+
+class AlertBroker:
+    """
+    In-process fan-out of committed alerts.
+    Subscribers park on a shared condition and slice a bounded, id-ordered
+    buffer with bisect, so a publish costs O(log buffer) per woken subscriber
+    and idle subscribers issue no database work. Each subscriber holds one
+    server thread for the lifetime of its stream, so the number of open
+    streams is capped by subscribe() (SSE_MAX_SUBSCRIBERS).
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._ids: List[int] = []
+        self._events: List[Dict] = []
+        self._cond = threading.Condition()
+        self.latest_id = 0
+        # Events with id <= floor_id may no longer (or never) be in the buffer.
+        self.floor_id = 0
+        self.subscribers = 0
+
+    def subscribe(self, limit: int) -> bool:
+        """Reserves a stream slot; False when limit streams are already open."""
+        with self._cond:
+            if self.subscribers >= limit:
+                return False
+            self.subscribers += 1
+            return True
+
+    def unsubscribe(self) -> None:
+        with self._cond:
+            self.subscribers = max(0, self.subscribers - 1)
+
+    def start_at(self, alert_id: int) -> None:
+        """Marks everything up to alert_id as committed before this broker existed."""
+        with self._cond:
+            self.latest_id = max(self.latest_id, alert_id)
+            self.floor_id = max(self.floor_id, alert_id)
+
+    def publish(self, events: Iterable[Dict]) -> None:
+        with self._cond:
+            for event in sorted(events, key=lambda e: e["id"]):
+                if event["id"] > self.latest_id:
+                    self._ids.append(event["id"])
+                    self._events.append(event)
+                    self.latest_id = event["id"]
+
+            excess = len(self._ids) - self.capacity
+            if excess > 0:
+                self.floor_id = self._ids[excess - 1]
+                del self._ids[:excess]
+                del self._events[:excess]
+            self._cond.notify_all()
+
+    def wait_for(self, last_id: int, timeout: float) -> Tuple[List[Dict], bool]:
+        """
+        Returns (events newer than last_id, gap), waiting up to timeout.
+        gap is True when events after last_id were evicted; the caller must
+        re-read them from the database before consuming the buffer again.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.latest_id > last_id, timeout)
+            if last_id < self.floor_id:
+                return [], True
+            return self._events[bisect_right(self._ids, last_id) :], False
+
+
+broker = AlertBroker(int(os.getenv("SSE_BUFFER_SIZE", 1000)))
+
+
+def fetch_alert_events(after_id: int, limit: Optional[int] = None) -> List[Dict]:
+    """Loads committed alerts with id > after_id, oldest first."""
+    stmt = (
+        select(ComplianceAlert, Trade)
+        .join(Trade, ComplianceAlert.trade_id == Trade.id)
+        .where(ComplianceAlert.id > after_id)
+        .order_by(ComplianceAlert.id)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return [alert_event(a, t) for a, t in db.session.execute(stmt).all()]
+
+
+def latest_alert_id() -> int:
+    return db.session.execute(select(func.max(ComplianceAlert.id))).scalar() or 0
+
+
+def uses_listen_notify() -> bool:
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+def announce_alerts(events: List[Dict]) -> None:
+    """
+    Called inside the ingestion transaction, before commit.
+    On Postgres a NOTIFY is queued and delivered only if the transaction commits;
+    other backends publish in-process via publish_committed_alerts().
+    """
+    if events and uses_listen_notify():
+        db.session.execute(
+            select(func.pg_notify(ALERT_CHANNEL, str(max(e["id"] for e in events))))
+        )
+
+
+def publish_committed_alerts(events: List[Dict]) -> None:
+    """Called after commit. Fallback path for backends without LISTEN/NOTIFY."""
+    if events and not uses_listen_notify():
+        broker.publish(events)
+
+
+def format_sse(event: Dict) -> str:
+    return f"id: {event['id']}\nevent: alert\ndata: {json.dumps(event)}\n\n"
+
+
+class AlertListenerService:
+    """
+    Holds a single LISTEN connection for the whole process and feeds the broker.
+    The NOTIFY payload is only a wake-up; alerts are re-read from the database
+    past the last published id, so coalesced or dropped notifications are harmless.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        self.dsn = url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+
+    def catch_up(self):
+        with self.app.app_context():
+            events = fetch_alert_events(broker.latest_id)
+            db.session.remove()
+        broker.publish(events)
+
+    def listen(self):
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute(f"LISTEN {ALERT_CHANNEL}")
+            print(f"[Stream] Listening on channel '{ALERT_CHANNEL}'.")
+            self.catch_up()
+            for _ in conn.notifies():
+                self.catch_up()
+
+    def start_background_loop(self):
+        with self.app.app_context():
+            broker.start_at(latest_alert_id())
+            db.session.remove()
+
+        def loop():
+            while True:
+                try:
+                    self.listen()
+                except Exception as e:
+                    print(f"[Stream] Listener error: {e}")
+                time.sleep(5)
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        print("[Stream] Alert listener started.")
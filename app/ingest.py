@@ -1,12 +1,92 @@
 import time
 import os
+import gzip
+import io
+import stat
 import paramiko
 import pandas as pd
 import threading
-from io import StringIO
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from . import db
 from .models import Trade, ComplianceAlert
+from .events import alert_event, announce_alerts, publish_committed_alerts
+from .profiling import track_queries
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Connection-level failures while streaming; the file is retried next cycle.
+TRANSIENT_ERRORS = (
+    paramiko.SSHException,
+    paramiko.SFTPError,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Names used by SFTP clients for uploads still in progress.
+PARTIAL_UPLOAD_SUFFIXES = (".filepart", ".part", ".partial", ".tmp", ".crdownload")
+
+CSV_COLUMNS = ["TradeDate", "AccountID", "Ticker", "Quantity", "Price"]
+PIPE_COLUMNS = [
+    "REPORT_DATE",
+    "ACCOUNT_ID",
+    "SECURITY_TICKER",
+    "SHARES",
+    "MARKET_VALUE",
+]
+
+
+class StreamReader(io.RawIOBase):
+    """
+    Adapts any object with read(n) (e.g. a paramiko SFTPFile) to io.RawIOBase,
+    so it can be buffered and peeked without seeking back on the remote file.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.fileobj.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+def is_ingestible(filename):
+    """Skips hidden files and in-progress uploads; format is detected from content."""
+    return not (
+        filename.startswith(".")
+        or filename.lower().endswith(PARTIAL_UPLOAD_SUFFIXES)
+    )
+
+
+def open_decompressed(fileobj, filename):
+    """
+    Wraps a binary stream in a streaming decompressor chosen by magic bytes.
+    Uncompressed input is returned buffered as-is.
+    """
+    stream = io.BufferedReader(StreamReader(fileobj), buffer_size=READ_BUFFER_SIZE)
+    magic = stream.peek(len(ZSTD_MAGIC))[: len(ZSTD_MAGIC)]
+
+    if magic.startswith(GZIP_MAGIC):
+        print(f"[SFTP] Detected gzip compression for {filename}")
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+
+    if magic.startswith(ZSTD_MAGIC):
+        if zstd is None:
+            raise ValueError("zstd input requires Python 3.14+ (compression.zstd)")
+        print(f"[SFTP] Detected zstd compression for {filename}")
+        return zstd.ZstdFile(stream, mode="rb")
+
+    return stream
 
 
 class SftpIngestionService:
@@ -18,6 +98,7 @@ class SftpIngestionService:
         self.password = os.getenv("SFTP_PASS", "pass")
         self.input_dir = os.getenv("SFTP_INPUT_DIR", "/upload")
         self.processed_dir = os.getenv("SFTP_PROCESSED_DIR", "/upload/processed")
+        self.rejected_dir = os.getenv("SFTP_REJECTED_DIR", "/upload/rejected")
 
     def get_transport(self):
         try:
@@ -31,12 +112,20 @@ class SftpIngestionService:
     def normalize_data(self, content, filename):
         """
         Detects format and returns a standardized DataFrame.
+        Accepts text or a binary stream; gzip/zstd input is decompressed while
+        parsing and format is detected from the header line, not the extension.
         Standardized Columns: date, account, ticker, quantity, price
         """
         try:
-            if "|" in content.splitlines()[0]:
+            if isinstance(content, str):
+                content = io.BytesIO(content.encode("utf-8"))
+
+            stream = open_decompressed(content, filename)
+            header = stream.peek(READ_BUFFER_SIZE).split(b"\n", 1)[0]
+
+            if b"|" in header:
                 print(f"[SFTP] Detected Format 2 (Pipe) for {filename}")
-                df = pd.read_csv(StringIO(content), sep="|")
+                df = pd.read_csv(stream, sep="|", usecols=PIPE_COLUMNS)
 
                 normalized = pd.DataFrame()
                 normalized["date"] = pd.to_datetime(
@@ -50,7 +139,7 @@ class SftpIngestionService:
 
             else:
                 print(f"[SFTP] Detected Format 1 (CSV) for {filename}")
-                df = pd.read_csv(StringIO(content))
+                df = pd.read_csv(stream, usecols=CSV_COLUMNS)
 
                 normalized = pd.DataFrame()
                 normalized["date"] = pd.to_datetime(df["TradeDate"]).dt.date
@@ -60,19 +149,31 @@ class SftpIngestionService:
                 normalized["price"] = df["Price"]
                 return normalized
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             print(f"[SFTP] Normalization Error in {filename}: {e}")
             return None
 
     def process_file(self, filename, sftp):
+        """
+        Returns True when ingested, False when the content is not a recognisable
+        report (the file is rejected), and None on transient errors (retried).
+        """
+        with track_queries(self.app.config["PROFILE_SLOW_QUERY_MS"]) as stats:
+            success = self.ingest_file(filename, sftp)
+        print(f"[Profile] process_file {filename}: {stats.summary()}")
+        return success
+
+    def ingest_file(self, filename, sftp):
         print(f"[SFTP] Processing {filename}...")
         full_path = f"{self.input_dir}/{filename}"
 
         try:
-            with sftp.open(full_path, "r") as remote_file:
-                content = remote_file.read().decode("utf-8")
+            with sftp.open(full_path, "rb") as remote_file:
+                remote_file.prefetch()
+                df = self.normalize_data(remote_file, filename)
 
-            df = self.normalize_data(content, filename)
             if df is None or df.empty:
                 print(f"[SFTP] Skipping {filename}: No valid data found.")
                 return False
@@ -81,6 +182,7 @@ class SftpIngestionService:
             account_totals = df.groupby("account")["row_value"].sum().to_dict()
 
             with self.app.app_context():
+                new_alerts = []
                 for _, row in df.iterrows():
                     stmt = pg_insert(Trade).values(
                         trade_date=row["date"],
@@ -124,11 +226,16 @@ class SftpIngestionService:
                                 description=f"Ticker {row['ticker']} represents {pct_str} of Account {row['account']}'s batch order.",
                             )
                             db.session.add(alert)
+                            new_alerts.append((alert, current_trade))
                             print(
                                 f"   [!] ALERT: {row['account']} / {row['ticker']} is {pct_str} of basket."
                             )
 
+                db.session.flush()
+                events = [alert_event(a, t) for a, t in new_alerts]
+                announce_alerts(events)
                 db.session.commit()
+                publish_committed_alerts(events)
                 print(f"[SFTP] Success: Ingested {len(df)} trades from {filename}")
 
             return True
@@ -136,7 +243,20 @@ class SftpIngestionService:
         except Exception as e:
             print(f"[SFTP] Error processing {filename}: {e}")
             db.session.rollback()
-            return False
+            return None
+
+    def move_file(self, sftp, file, target_dir, action):
+        old_path = f"{self.input_dir}/{file}"
+        new_path = f"{target_dir}/{file}"
+        try:
+            try:
+                sftp.remove(new_path)
+            except IOError:
+                pass
+            sftp.rename(old_path, new_path)
+            print(f"[SFTP] {action} {file} to {new_path}")
+        except IOError as e:
+            print(f"[SFTP] CRITICAL: Failed to move {file}: {e}")
 
     def run_cycle(self):
         transport = self.get_transport()
@@ -146,29 +266,23 @@ class SftpIngestionService:
         try:
             sftp = paramiko.SFTPClient.from_transport(transport)
 
-            try:
-                sftp.mkdir(self.processed_dir)
-            except IOError:
-                pass
+            for directory in (self.processed_dir, self.rejected_dir):
+                try:
+                    sftp.mkdir(directory)
+                except IOError:
+                    pass
 
-            files = sftp.listdir(self.input_dir)
-            for file in files:
-                if file == "processed":
+            for entry in sftp.listdir_attr(self.input_dir):
+                file = entry.filename
+                if stat.S_ISDIR(entry.st_mode or 0) or not is_ingestible(file):
                     continue
 
-                if file.endswith(".csv"):
-                    if self.process_file(file, sftp):
-                        old_path = f"{self.input_dir}/{file}"
-                        new_path = f"{self.processed_dir}/{file}"
-                        try:
-                            try:
-                                sftp.remove(new_path)
-                            except IOError:
-                                pass
-                            sftp.rename(old_path, new_path)
-                            print(f"[SFTP] Archived {file} to {new_path}")
-                        except IOError as e:
-                            print(f"[SFTP] CRITICAL: Failed to move {file}: {e}")
+                result = self.process_file(file, sftp)
+                if result is True:
+                    self.move_file(sftp, file, self.processed_dir, "Archived")
+                elif result is False:
+                    # Manifests, checksums, markers etc. are tried once, not every cycle.
+                    self.move_file(sftp, file, self.rejected_dir, "Rejected")
         except Exception as e:
             print(f"[SFTP] Cycle error: {e}")
         finally:
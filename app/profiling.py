@@ -0,0 +1,234 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from . import db
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """
+    Per-request (or per-file) SQL counters.
+    Hydration is the time from a statement's cursor returning until the last
+    ORM instance built from its rows, i.e. fetch plus object construction.
+    """
+
+    def __init__(self, slow_query_ms: float):
+        self.slow_query_ms = slow_query_ms
+        self.statements = 0
+        self.db_time = 0.0
+        self.hydration_time = 0.0
+        self.started = time.perf_counter()
+        self._rows_ready: Optional[float] = None
+        self._last_load: Optional[float] = None
+
+    def settle(self) -> None:
+        if self._rows_ready is not None and self._last_load is not None:
+            self.hydration_time += max(0.0, self._last_load - self._rows_ready)
+        self._rows_ready = self._last_load = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        return (
+            f"{self.elapsed * 1000:.1f}ms total, {self.statements} statements, "
+            f"db={self.db_time * 1000:.1f}ms, orm={self.hydration_time * 1000:.1f}ms"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.settle()
+        # Kept on the execution context, not the pooled connection, so a
+        # statement that raises leaves nothing behind.
+        context.profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "profile_start", None)
+    if stats is None or started is None:
+        return
+
+    now = time.perf_counter()
+    duration = now - started
+    stats.statements += 1
+    stats.db_time += duration
+    stats._rows_ready = now
+
+    if duration * 1000 > stats.slow_query_ms:
+        sql = " ".join(statement.split())
+        print(f"[Profile] Slow query ({duration * 1000:.1f}ms): {sql[:500]}")
+
+
+def _on_load(target, context):
+    stats = _current.get()
+    if stats is not None:
+        stats._last_load = time.perf_counter()
+
+
+_installed = False
+
+
+def install_listeners() -> None:
+    """Registers engine/ORM events once per process; they no-op outside tracking."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db.Model, "load", _on_load, propagate=True)
+    _installed = True
+
+
+@contextmanager
+def track_queries(slow_query_ms: float) -> Iterator[QueryStats]:
+    """Collects QueryStats for all statements issued inside the block."""
+    stats = QueryStats(slow_query_ms)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.settle()
+        _current.reset(token)
+
+
+class StackSampler:
+    """
+    Samples one thread's stack from a helper thread via sys._current_frames().
+    Unlike cProfile, which on 3.12+ hooks sys.monitoring for the whole
+    interpreter, reports only contain the profiled request's thread.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                location = f"{code.co_filename}:{code.co_firstlineno}"
+                stack.append(f"{code.co_name} ({location})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str, title: str) -> None:
+        """Writes <path>.folded (flamegraph/speedscope input) and <path>.txt."""
+        with open(f"{path}.folded", "w") as folded:
+            for stack, count in self.stacks.most_common():
+                folded.write(f"{stack} {count}\n")
+
+        inclusive: Counter = Counter()
+        leaf: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            leaf[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+
+        total = sum(self.stacks.values()) or 1
+        with open(f"{path}.txt", "w") as report:
+            report.write(f"{title}\n")
+            report.write(f"{total} samples every {self.interval * 1000:.1f}ms\n\n")
+            for heading, counter in (("Inclusive", inclusive), ("Self", leaf)):
+                report.write(f"{heading}:\n")
+                for name, count in counter.most_common(40):
+                    report.write(f"{count / total:7.1%} {count:6d}  {name}\n")
+                report.write("\n")
+
+
+def _explicitly_profiled(app: Flask) -> bool:
+    enabled = app.config["PROFILE_HEADER_ENABLED"]
+    return bool(enabled and request.headers.get("X-Profile"))
+
+
+def _dump_profile(app: Flask, sampler: StackSampler) -> None:
+    profile_dir = app.config["PROFILE_DIR"]
+    os.makedirs(profile_dir, exist_ok=True)
+    name = "-".join(
+        [
+            time.strftime("%Y%m%dT%H%M%S"),
+            request.endpoint or "unknown",
+            str(os.getpid()),
+            str(threading.get_ident()),
+        ]
+    )
+    path = os.path.join(profile_dir, name)
+
+    sampler.write(path, f"{request.method} {request.full_path}")
+    print(f"[Profile] Wrote {path}.folded")
+
+
+def init_profiling(app: Flask) -> None:
+    install_listeners()
+
+    @app.before_request
+    def start_profiling():
+        _current.set(QueryStats(app.config["PROFILE_SLOW_QUERY_MS"]))
+        g.profiler = None
+        sampled = random.random() < app.config["PROFILE_SAMPLE_RATE"]
+        if sampled or _explicitly_profiled(app):
+            interval = app.config["PROFILE_SAMPLE_INTERVAL_MS"] / 1000
+            g.profiler = StackSampler(threading.get_ident(), interval)
+            g.profiler.start()
+
+    @app.after_request
+    def report_profiling(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+
+        stats.settle()
+        # Timings are only exposed to callers when explicitly enabled.
+        if app.config["PROFILE_TIMING_HEADERS"] or _explicitly_profiled(app):
+            response.headers["Server-Timing"] = (
+                f"db;dur={stats.db_time * 1000:.1f}, "
+                f"orm;dur={stats.hydration_time * 1000:.1f}, "
+                f"total;dur={stats.elapsed * 1000:.1f}"
+            )
+            response.headers["X-Query-Count"] = str(stats.statements)
+
+        if stats.elapsed * 1000 > app.config["PROFILE_SLOW_REQUEST_MS"]:
+            print(
+                f"[Profile] Slow request {request.method} {request.full_path}: "
+                f"{stats.summary()}"
+            )
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        sampler = g.pop("profiler", None)
+        if sampler is not None:
+            sampler.stop()
+            try:
+                _dump_profile(app, sampler)
+            except OSError as e:
+                print(f"[Profile] Could not write profile: {e}")
+
+        _current.set(None)
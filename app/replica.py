@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+from flask import Flask, current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+
+_read_engine: ContextVar[Optional[Engine]] = ContextVar("read_engine", default=None)
+
+PG_REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+def engine_options(
+    url: str, prefix: str, fallback: Optional[str] = None, connect_timeout: int = 0
+) -> dict:
+    """
+    Builds engine options from <prefix>_* env vars, falling back to <fallback>_*.
+    Pool sizing only applies to server databases; connect and statement
+    timeouts to Postgres.
+    """
+
+    def setting(name, default):
+        value = os.getenv(f"{prefix}_{name}")
+        if value is None and fallback:
+            value = os.getenv(f"{fallback}_{name}")
+        return default if value is None else value
+
+    options = {
+        "pool_pre_ping": setting("POOL_PRE_PING", "true").lower() == "true",
+    }
+
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        options["pool_size"] = int(setting("POOL_SIZE", 5))
+        options["max_overflow"] = int(setting("MAX_OVERFLOW", 10))
+        options["pool_timeout"] = float(setting("POOL_TIMEOUT", 30))
+        options["pool_recycle"] = int(setting("POOL_RECYCLE", 1800))
+
+    if backend == "postgresql":
+        connect_args = {}
+        timeout_ms = int(setting("STATEMENT_TIMEOUT_MS", 0))
+        if timeout_ms > 0:
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+        timeout_s = int(setting("CONNECT_TIMEOUT", connect_timeout))
+        if timeout_s > 0:
+            connect_args["connect_timeout"] = timeout_s
+        if connect_args:
+            options["connect_args"] = connect_args
+
+    return options
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica engine inside views marked @use_read_replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = _read_engine.get()
+        if bind is None and engine is not None and not self._flushing:
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaMonitor:
+    """
+    Caches replica health so lag is measured at most once per check interval,
+    not on every request. Unreachable or lagging replicas are reported unhealthy.
+    Only one request runs a stale check; concurrent requests use the cached
+    result instead of queueing behind a slow or unreachable replica.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.lag: Optional[float] = None
+        self._healthy = False
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def measure_lag(self, engine) -> float:
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                return float(conn.execute(PG_REPLICA_LAG).scalar() or 0)
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def is_healthy(self, engine) -> bool:
+        interval = self.config["REPLICA_LAG_CHECK_SECONDS"]
+        if time.monotonic() - self._checked_at < interval:
+            return self._healthy
+
+        if not self._lock.acquire(blocking=False):
+            return self._healthy
+
+        try:
+            if time.monotonic() - self._checked_at < interval:
+                return self._healthy
+
+            max_lag = self.config["REPLICA_MAX_LAG_SECONDS"]
+            try:
+                self.lag = self.measure_lag(engine)
+                self._healthy = self.lag <= max_lag
+                if not self._healthy:
+                    print(
+                        f"[Replica] Lag {self.lag:.1f}s exceeds "
+                        f"{max_lag}s; reading from primary."
+                    )
+            except Exception as e:
+                self.lag = None
+                self._healthy = False
+                print(f"[Replica] Health check failed, reading from primary: {e}")
+
+            self._checked_at = time.monotonic()
+            return self._healthy
+        finally:
+            self._lock.release()
+
+
+def make_replica_engine(app: Flask) -> Optional[Engine]:
+    url = app.config.get("REPLICA_DATABASE_URI")
+    if not url:
+        return None
+
+    url = make_url(url)
+    # Match Flask-SQLAlchemy: relative SQLite paths live in the instance folder.
+    if (
+        url.get_backend_name() == "sqlite"
+        and url.database not in (None, "", ":memory:")
+        and not os.path.isabs(url.database)
+    ):
+        os.makedirs(app.instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+
+    return create_engine(url, **app.config["REPLICA_ENGINE_OPTIONS"])
+
+
+def init_replica(app: Flask) -> None:
+    """
+    The replica engine is kept outside SQLALCHEMY_BINDS: it mirrors the primary's
+    tables rather than owning models, and a bind would register metadata on the
+    shared db object.
+    """
+    app.extensions["replica_engine"] = make_replica_engine(app)
+    app.extensions["replica_monitor"] = ReplicaMonitor(app.config)
+
+
+def use_read_replica(view):
+    """Routes the view's queries to the replica while it is healthy."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        engine = current_app.extensions["replica_engine"]
+        monitor = current_app.extensions["replica_monitor"]
+
+        if engine is None or not monitor.is_healthy(engine):
+            return view(*args, **kwargs)
+
+        token = _read_engine.set(engine)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _read_engine.reset(token)
+
+    return wrapper
@@ -1,13 +1,74 @@
 from app.notifications import notify_external_services
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from sqlalchemy import select, text
 from datetime import datetime
 from . import db
+from .events import broker, fetch_alert_events, format_sse, latest_alert_id
 from .models import Trade, ComplianceAlert
+from .replica import use_read_replica
 
 bp = Blueprint("main", __name__)
 
 
+def build_blotter(trades):
+    """Simplified report rows for a set of trades."""
+    return [
+        {
+            "id": trade.id,
+            "ticker": trade.ticker,
+            "account": trade.account,
+            "quantity": trade.quantity,
+            "price": float(trade.price),
+            "total_value": float(trade.price) * abs(trade.quantity),
+        }
+        for trade in trades
+    ]
+
+
+def build_positions(trades):
+    """Percentage of funds by ticker for each account in a set of trades."""
+    account_totals = {}
+    account_holdings = {}
+
+    for t in trades:
+        val = float(t.price) * abs(t.quantity)
+
+        if t.account not in account_totals:
+            account_totals[t.account] = 0.0
+            account_holdings[t.account] = {}
+
+        account_totals[t.account] += val
+
+        current_ticker_val = account_holdings[t.account].get(t.ticker, 0.0)
+        account_holdings[t.account][t.ticker] = current_ticker_val + val
+
+    response_data = {}
+
+    for acc_id, total_val in account_totals.items():
+        response_data[acc_id] = {}
+        holdings = account_holdings[acc_id]
+
+        for ticker, ticker_val in holdings.items():
+            if total_val > 0:
+                pct = (ticker_val / total_val) * 100
+                response_data[acc_id][ticker] = f"{pct:.1f}%"
+            else:
+                response_data[acc_id][ticker] = "0.0%"
+
+    return response_data
+
+
+def build_alarm(alert, trade):
+    """Alarm row for an alert and the trade that triggered it."""
+    return {
+        "account": trade.account,
+        "ticker": trade.ticker,
+        "rule": alert.rule_name,
+        "description": alert.description,
+        "triggered": True,
+    }
+
+
 @bp.route("/health", methods=["GET"])
 def health():
     """Operational Endpoint: Checks app status and DB connectivity."""
@@ -28,6 +89,7 @@ def health():
 
 
 @bp.route("/blotter")
+@use_read_replica
 def get_blotter():
     """
     Endpoint A: GET blotter?date=<query date>
@@ -47,26 +109,14 @@ def get_blotter():
         stmt = select(Trade).where(Trade.trade_date == query_date)
         results = db.session.execute(stmt).scalars().all()
 
-        data = []
-        for trade in results:
-            data.append(
-                {
-                    "id": trade.id,
-                    "ticker": trade.ticker,
-                    "account": trade.account,
-                    "quantity": trade.quantity,
-                    "price": float(trade.price),
-                    "total_value": float(trade.price) * abs(trade.quantity),
-                }
-            )
-
-        return jsonify(data), 200
+        return jsonify(build_blotter(results)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @bp.route("/positions")
+@use_read_replica
 def get_positions():
     """
     Endpoint B: GET positions?date=<query date>
@@ -86,41 +136,14 @@ def get_positions():
         stmt = select(Trade).where(Trade.trade_date == query_date)
         trades = db.session.execute(stmt).scalars().all()
 
-        account_totals = {}
-        account_holdings = {}
-
-        for t in trades:
-            val = float(t.price) * abs(t.quantity)
-
-            if t.account not in account_totals:
-                account_totals[t.account] = 0.0
-                account_holdings[t.account] = {}
-
-            account_totals[t.account] += val
-
-            current_ticker_val = account_holdings[t.account].get(t.ticker, 0.0)
-            account_holdings[t.account][t.ticker] = current_ticker_val + val
-
-        response_data = {}
-
-        for acc_id, total_val in account_totals.items():
-            response_data[acc_id] = {}
-            holdings = account_holdings[acc_id]
-
-            for ticker, ticker_val in holdings.items():
-                if total_val > 0:
-                    pct = (ticker_val / total_val) * 100
-                    response_data[acc_id][ticker] = f"{pct:.1f}%"
-                else:
-                    response_data[acc_id][ticker] = "0.0%"
-
-        return jsonify(response_data), 200
+        return jsonify(build_positions(trades)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @bp.route("/alarms")
+@use_read_replica
 def get_alarms():
     """
     Endpoint C: GET alarms?date=<query date>
@@ -146,13 +169,7 @@ def get_alarms():
 
         alerts = []
         for alert, trade in results:
-            alert_obj = {
-                "account": trade.account,
-                "ticker": trade.ticker,
-                "rule": alert.rule_name,
-                "description": alert.description,
-                "triggered": True,
-            }
+            alert_obj = build_alarm(alert, trade)
             alerts.append(alert_obj)
 
             # Dummy function to represent external notification
@@ -164,3 +181,204 @@ def get_alarms():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/alarms/stream")
+def stream_alarms():
+    """
+    Endpoint D: GET alarms/stream[?last_id=<alert id>]
+    Server-Sent Events feed of alerts as ingestion commits them.
+    Resumes after last_id (or the Last-Event-ID header) when given,
+    otherwise starts from the newest committed alert.
+    Each stream holds a server thread; at most SSE_MAX_SUBSCRIBERS are open
+    per process and further requests get 503.
+    """
+    last_id_str = request.args.get("last_id") or request.headers.get("Last-Event-ID")
+
+    try:
+        last_id = int(last_id_str) if last_id_str else None
+    except ValueError:
+        return jsonify({"error": "Invalid last_id. Use an integer alert id"}), 400
+
+    try:
+        cursor = latest_alert_id() if last_id is None else last_id
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    app = current_app._get_current_object()
+    heartbeat = app.config["SSE_HEARTBEAT_SECONDS"]
+    page_size = app.config["SSE_BACKLOG_PAGE_SIZE"]
+
+    def read_backlog(cursor):
+        """Pages committed alerts after cursor out of the database."""
+        while True:
+            with app.app_context():
+                page = fetch_alert_events(cursor, limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = page[-1]["id"]
+
+    def generate(cursor):
+        yield "retry: 3000\n\n"
+        backfill = last_id is not None
+
+        while True:
+            if backfill:
+                backfill = False
+                start = cursor
+                for event in read_backlog(cursor):
+                    yield format_sse(event)
+                    cursor = event["id"]
+                if cursor == start:
+                    # Evicted ids no longer in the database (e.g. deleted trades).
+                    cursor = max(cursor, broker.floor_id)
+
+            events, gap = broker.wait_for(cursor, timeout=heartbeat)
+            if gap:
+                backfill = True
+                continue
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield format_sse(event)
+            cursor = events[-1]["id"]
+
+    if not broker.subscribe(app.config["SSE_MAX_SUBSCRIBERS"]):
+        return (
+            jsonify({"error": "Too many open alert streams. Retry later"}),
+            503,
+            {"Retry-After": "30"},
+        )
+
+    response = Response(
+        generate(cursor),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs even if the client disconnects before the generator starts.
+    response.call_on_close(broker.unsubscribe)
+    return response
+
+
+BATCH_ENDPOINTS = ("blotter", "positions", "alarms")
+
+
+@bp.route("/query", methods=["POST"])
+@use_read_replica
+def batch_query():
+    """
+    Endpoint E: POST query
+    Body: {"queries": [{"endpoint": "blotter|positions|alarms",
+                        "date": "YYYY-MM-DD", "account": "<optional>"}, ...]}
+    Answers every item from at most two SQL queries (trades and alerts over
+    the union of requested dates) and returns results in request order.
+    Invalid items get their own error entry without failing the batch.
+    Alarms fetched here are not forwarded to external notifications.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get("queries") if isinstance(payload, dict) else None
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Body must contain a non-empty 'queries' list"}), 400
+
+    max_items = current_app.config["BATCH_QUERY_MAX_ITEMS"]
+    if len(items) > max_items:
+        return jsonify({"error": f"Too many queries. Maximum is {max_items}"}), 400
+
+    results = [None] * len(items)
+    parsed = []
+    parsed_dates = {}
+
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = {"status": 400, "error": "Query must be an object"}
+            continue
+
+        endpoint = item.get("endpoint")
+        date_str = item.get("date")
+        account = item.get("account")
+        entry = {"endpoint": endpoint, "date": date_str, "account": account}
+        results[i] = entry
+
+        if endpoint not in BATCH_ENDPOINTS:
+            entry.update(
+                status=400,
+                error=f"Invalid endpoint. Use one of: {', '.join(BATCH_ENDPOINTS)}",
+            )
+            continue
+
+        if not date_str:
+            entry.update(status=400, error="Missing required parameter: date")
+            continue
+
+        if account is not None and not isinstance(account, str):
+            entry.update(status=400, error="Invalid account. Use a string account id")
+            continue
+
+        if isinstance(date_str, str) and date_str not in parsed_dates:
+            try:
+                parsed_dates[date_str] = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                parsed_dates[date_str] = None
+
+        if not isinstance(date_str, str) or parsed_dates[date_str] is None:
+            entry.update(status=400, error="Invalid date format. Use YYYY-MM-DD")
+            continue
+
+        parsed.append((entry, endpoint, parsed_dates[date_str], account))
+
+    def scope(endpoints):
+        """Dates to fetch, plus an account filter when every item has one."""
+        wanted = [(d, a) for _, e, d, a in parsed if e in endpoints]
+        dates = {d for d, _ in wanted}
+        accounts = {a for _, a in wanted}
+        return dates, (None if None in accounts else accounts)
+
+    try:
+        trades_by_date = {}
+        dates, accounts = scope(("blotter", "positions"))
+        if dates:
+            stmt = select(Trade).where(Trade.trade_date.in_(dates))
+            if accounts:
+                stmt = stmt.where(Trade.account.in_(accounts))
+            for trade in db.session.execute(stmt).scalars():
+                trades_by_date.setdefault(trade.trade_date, []).append(trade)
+
+        alarms_by_date = {}
+        dates, accounts = scope(("alarms",))
+        if dates:
+            stmt = (
+                select(ComplianceAlert, Trade)
+                .join(Trade, ComplianceAlert.trade_id == Trade.id)
+                .where(Trade.trade_date.in_(dates))
+            )
+            if accounts:
+                stmt = stmt.where(Trade.account.in_(accounts))
+            for alert, trade in db.session.execute(stmt).all():
+                alarms_by_date.setdefault(trade.trade_date, []).append((alert, trade))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    for entry, endpoint, query_date, account in parsed:
+        if endpoint == "alarms":
+            rows = alarms_by_date.get(query_date, [])
+            data = [
+                build_alarm(alert, trade)
+                for alert, trade in rows
+                if account is None or trade.account == account
+            ]
+        else:
+            trades = [
+                t
+                for t in trades_by_date.get(query_date, [])
+                if account is None or t.account == account
+            ]
+            builder = build_blotter if endpoint == "blotter" else build_positions
+            data = builder(trades)
+
+        entry.update(status=200, data=data)
+
+    return jsonify({"results": results}), 200
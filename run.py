@@ -13,5 +13,12 @@ if __name__ == "__main__":
     ingestor = SftpIngestionService(app)
     ingestor.start_background_loop()
 
+    # Push committed alerts to /alarms/stream subscribers via LISTEN/NOTIFY.
+    # Other backends fall back to in-process publishing from the ingestor.
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("postgresql"):
+        from app.events import AlertListenerService
+
+        AlertListenerService(app).start_background_loop()
+
     # Run the app
     app.run(host="0.0.0.0", port=5000)
@@ -1,5 +1,9 @@
+import gzip
 import pytest
 import pandas as pd
+import stat
+from types import SimpleNamespace
+import app.ingest as ingest
 from app.ingest import SftpIngestionService
 
 
@@ -8,6 +12,8 @@ class MockApp:
     Mock Flask App that functions as a context manager.
     Essential because the service uses 'with self.app.app_context():'
     """
+    config = {"PROFILE_SLOW_QUERY_MS": 100}
+
     def app_context(self):
         return self
 
@@ -59,4 +65,156 @@ def test_normalization_invalid():
 
     df = service.normalize_data(garbage_content, "garbage.txt")
 
-    assert df is None
\ No newline at end of file
+    assert df is None
+
+
+class NonSeekableFile:
+    """Mimics a remote SFTP handle: read(n) only, no seek/peek."""
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, size=-1):
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+CSV_CONTENT = b"""TradeDate,AccountID,Ticker,Quantity,Price,TradeType,SettlementDate
+2025-01-15,ACC001,AAPL,100,185.50,BUY,2025-01-17
+2025-01-15,ACC001,MSFT,50,420.25,BUY,2025-01-17"""
+
+PIPE_CONTENT = b"""REPORT_DATE|ACCOUNT_ID|SECURITY_TICKER|SHARES|MARKET_VALUE|TRANS_TYPE
+20250115|ACC002|GOOGL|10|2000.00|BUY"""
+
+
+def test_normalization_gzip_stream():
+    """Test that gzip input is detected by content and streamed into the parser."""
+    service = SftpIngestionService(MockApp())
+
+    df = service.normalize_data(
+        NonSeekableFile(gzip.compress(CSV_CONTENT)), "trades.bin"
+    )
+
+    assert df is not None
+    assert list(df["ticker"]) == ["AAPL", "MSFT"]
+    assert df.iloc[1]["price"] == 420.25
+
+
+def test_normalization_gzip_pipe_without_csv_extension():
+    """Test that a compressed pipe file is recognised regardless of its name."""
+    service = SftpIngestionService(MockApp())
+
+    df = service.normalize_data(
+        NonSeekableFile(gzip.compress(PIPE_CONTENT)), "snapshot.dat.gz"
+    )
+
+    assert df is not None
+    assert df.iloc[0]["ticker"] == "GOOGL"
+    assert df.iloc[0]["price"] == 200.00
+
+
+def test_normalization_zstd_stream():
+    """
+    Test that zstd input is decompressed when the runtime supports it.
+    compression.zstd ships with Python 3.14 (Dockerfile/CI); skipped on older runtimes.
+    """
+    zstd = pytest.importorskip("compression.zstd")
+    service = SftpIngestionService(MockApp())
+
+    df = service.normalize_data(
+        NonSeekableFile(zstd.compress(PIPE_CONTENT)), "snapshot.txt.zst"
+    )
+
+    assert df is not None
+    assert df.iloc[0]["quantity"] == 10
+
+
+class FakeSftp:
+    """Directory listing plus a record of where files were moved."""
+    def __init__(self, names):
+        self.names = names
+        self.moves = {}
+
+    def mkdir(self, path):
+        raise IOError("exists")
+
+    def listdir_attr(self, path):
+        return [
+            SimpleNamespace(
+                filename=name,
+                st_mode=stat.S_IFDIR if name == "processed" else stat.S_IFREG,
+            )
+            for name in self.names
+        ]
+
+    def rename(self, old, new):
+        self.moves[old.rsplit("/", 1)[1]] = new.rsplit("/", 1)[0]
+
+    def remove(self, path):
+        pass
+
+
+class FakeTransport:
+    def close(self):
+        pass
+
+
+def run_cycle_with(monkeypatch, names, process_file):
+    service = SftpIngestionService(MockApp())
+    sftp = FakeSftp(names)
+    monkeypatch.setattr(service, "get_transport", lambda: FakeTransport())
+    monkeypatch.setattr(
+        ingest.paramiko.SFTPClient, "from_transport", lambda transport: sftp
+    )
+    monkeypatch.setattr(service, "process_file", process_file)
+    service.run_cycle()
+    return service, sftp
+
+
+def test_run_cycle_skips_hidden_and_partial_uploads(monkeypatch):
+    """Files are ingested regardless of extension, except in-progress uploads."""
+    names = [
+        "trades.csv",
+        "snapshot.dat.gz",
+        "positions.txt",
+        ".hidden.csv",
+        "upload.csv.filepart",
+        "upload.csv.part",
+        "upload.TMP",
+        "processed",
+    ]
+    processed = []
+
+    run_cycle_with(
+        monkeypatch, names, lambda name, sftp: processed.append(name) or True
+    )
+
+    assert processed == ["trades.csv", "snapshot.dat.gz", "positions.txt"]
+
+
+def test_run_cycle_rejects_non_data_files_once(monkeypatch):
+    """
+    Unrecognised files (manifests, checksums) move to the rejected directory;
+    transient failures stay in place to be retried next cycle.
+    """
+    results = {"trades.csv": True, "trades.csv.md5": False, "flaky.csv": None}
+
+    service, sftp = run_cycle_with(
+        monkeypatch, list(results), lambda name, sftp: results[name]
+    )
+
+    assert sftp.moves == {
+        "trades.csv": service.processed_dir,
+        "trades.csv.md5": service.rejected_dir,
+    }
+
+
+def test_normalize_data_reraises_transient_errors():
+    """Connection drops mid-stream are retried rather than rejected."""
+    service = SftpIngestionService(MockApp())
+
+    class DroppedConnection:
+        def read(self, size=-1):
+            raise ingest.paramiko.SSHException("connection lost")
+
+    with pytest.raises(ingest.paramiko.SSHException):
+        service.normalize_data(DroppedConnection(), "trades.csv")
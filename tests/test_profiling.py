@@ -0,0 +1,120 @@
+import threading
+import time
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models import Trade
+from app.profiling import StackSampler, track_queries
+
+
+def test_request_reports_query_stats(client, app, seed_data):
+    """With timing headers enabled, responses carry statement count and timings."""
+    app.config["PROFILE_TIMING_HEADERS"] = True
+    response = client.get("/blotter?date=2025-01-15")
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "1"
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert "orm;dur=" in response.headers["Server-Timing"]
+
+
+def test_timing_headers_hidden_by_default(client, seed_data):
+    response = client.get("/blotter?date=2025-01-15")
+
+    assert "Server-Timing" not in response.headers
+    assert "X-Query-Count" not in response.headers
+
+
+def test_slow_request_and_query_logged(client, app, seed_data, capsys):
+    app.config.update({"PROFILE_SLOW_REQUEST_MS": 0, "PROFILE_SLOW_QUERY_MS": 0})
+
+    client.get("/positions?date=2025-01-15")
+
+    out = capsys.readouterr().out
+    assert "[Profile] Slow query" in out
+    assert "[Profile] Slow request GET /positions?date=2025-01-15" in out
+
+
+def test_track_queries_measures_hydration(app, seed_data):
+    with app.app_context():
+        with track_queries(slow_query_ms=1000) as stats:
+            trades = db.session.execute(select(Trade)).scalars().all()
+
+    assert len(trades) == 3
+    assert stats.statements == 1
+    assert stats.db_time > 0
+    assert stats.hydration_time > 0
+
+
+def test_sampling_profiler_via_header(client, app, tmp_path):
+    app.config.update({"PROFILE_HEADER_ENABLED": True, "PROFILE_DIR": str(tmp_path)})
+
+    response = client.get("/blotter?date=2025-01-15", headers={"X-Profile": "1"})
+
+    assert len(list(tmp_path.glob("*.folded"))) == 1
+    assert len(list(tmp_path.glob("*.txt"))) == 1
+    assert "X-Query-Count" in response.headers
+
+
+def test_profile_header_ignored_by_default(client, tmp_path, app):
+    app.config["PROFILE_DIR"] = str(tmp_path)
+
+    response = client.get("/blotter?date=2025-01-15", headers={"X-Profile": "1"})
+
+    assert list(tmp_path.iterdir()) == []
+    assert "X-Query-Count" not in response.headers
+
+
+def test_stack_sampler_only_records_target_thread(tmp_path):
+    """Work on other threads must not leak into a request's profile."""
+
+    def busy_other_thread(stop):
+        while not stop.is_set():
+            sum(range(100))
+
+    def profiled_work():
+        deadline = time.monotonic() + 0.1
+        while time.monotonic() < deadline:
+            sum(range(100))
+
+    stop = threading.Event()
+    other = threading.Thread(target=busy_other_thread, args=(stop,))
+    other.start()
+
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    profiled_work()
+    sampler.stop()
+    stop.set()
+    other.join()
+
+    sampler.write(str(tmp_path / "report"), "test")
+    folded = (tmp_path / "report.folded").read_text()
+    assert "profiled_work" in folded
+    assert "busy_other_thread" not in folded
+
+
+def register_sleep(connection):
+    connection.connection.driver_connection.create_function(
+        "sleep_ms", 1, lambda ms: time.sleep(ms / 1000)
+    )
+
+
+def test_failed_statement_is_not_counted_or_timed(app):
+    """A statement that raises is skipped, and later ones time from their own start."""
+    with app.app_context():
+        with track_queries(slow_query_ms=1000) as stats:
+            try:
+                db.session.execute(text("SELECT * FROM missing_table"))
+            except OperationalError:
+                db.session.rollback()
+
+            assert stats.statements == 0
+            assert stats.db_time == 0
+
+            time.sleep(0.2)
+            register_sleep(db.session.connection())
+            db.session.execute(text("SELECT sleep_ms(50)"))
+
+    assert stats.statements == 1
+    assert 0.05 <= stats.db_time < 0.2
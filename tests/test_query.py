@@ -0,0 +1,111 @@
+from datetime import date
+from app import db
+from app.models import Trade, ComplianceAlert
+
+
+def test_query_requires_queries_list(client):
+    response = client.post("/query", json={"queries": []})
+    assert response.status_code == 400
+    assert "non-empty 'queries' list" in response.json["error"]
+
+
+def test_query_rejects_oversized_batch(client, app):
+    app.config["BATCH_QUERY_MAX_ITEMS"] = 2
+    queries = [{"endpoint": "blotter", "date": "2025-01-15"}] * 3
+
+    response = client.post("/query", json={"queries": queries})
+    assert response.status_code == 400
+    assert "Maximum is 2" in response.json["error"]
+
+
+def test_query_multiple_dates_in_one_request(client, app, seed_data):
+    """Blotter and positions for several dates match the single endpoints."""
+    app.config["PROFILE_TIMING_HEADERS"] = True
+    response = client.post(
+        "/query",
+        json={
+            "queries": [
+                {"endpoint": "blotter", "date": "2025-01-15"},
+                {"endpoint": "positions", "date": "2025-01-16"},
+                {"endpoint": "positions", "date": "2025-01-15", "account": "ACC002"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "1"
+
+    blotter, positions, filtered = response.json["results"]
+    assert blotter["status"] == 200
+    assert blotter["data"] == client.get("/blotter?date=2025-01-15").json
+    assert positions["data"] == {"ACC001": {"MSFT": "100.0%"}}
+    assert filtered["account"] == "ACC002"
+    assert filtered["data"] == {"ACC002": {"GOOG": "100.0%"}}
+
+
+def test_query_alarms_with_account_filter(client, app):
+    with app.app_context():
+        for account in ("RISKY_ACC", "OTHER_ACC"):
+            trade = Trade(
+                trade_date=date(2025, 3, 2),
+                account=account,
+                ticker="MEME",
+                quantity=1000,
+                price=10.00,
+            )
+            db.session.add(trade)
+            db.session.flush()
+            db.session.add(
+                ComplianceAlert(
+                    trade_id=trade.id,
+                    rule_name="Basket Concentration (>20%)",
+                    severity="WARNING",
+                    description="Ticker MEME is 100% of basket",
+                )
+            )
+        db.session.commit()
+
+    response = client.post(
+        "/query",
+        json={
+            "queries": [
+                {"endpoint": "alarms", "date": "2025-03-02", "account": "RISKY_ACC"},
+                {"endpoint": "alarms", "date": "2025-03-03"},
+            ]
+        },
+    )
+    found, empty = response.json["results"]
+
+    assert len(found["data"]) == 1
+    assert found["data"][0]["account"] == "RISKY_ACC"
+    assert found["data"][0]["triggered"] is True
+    assert empty == {
+        "endpoint": "alarms",
+        "date": "2025-03-03",
+        "account": None,
+        "status": 200,
+        "data": [],
+    }
+
+
+def test_query_isolates_item_errors(client, seed_data):
+    response = client.post(
+        "/query",
+        json={
+            "queries": [
+                {"endpoint": "blotter", "date": "01-15-2025"},
+                {"endpoint": "trades", "date": "2025-01-15"},
+                {"endpoint": "positions"},
+                "not-an-object",
+                {"endpoint": "blotter", "date": "2025-01-15"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+    bad_date, bad_endpoint, no_date, not_object, ok = response.json["results"]
+    assert "Invalid date format" in bad_date["error"]
+    assert "Invalid endpoint" in bad_endpoint["error"]
+    assert "Missing required parameter" in no_date["error"]
+    assert not_object["status"] == 400
+    assert ok["status"] == 200
+    assert len(ok["data"]) == 2
@@ -0,0 +1,120 @@
+import pytest
+from datetime import date
+from app import create_app, db
+from app.models import Trade
+from app.replica import engine_options
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """App with two SQLite files standing in for primary and read replica."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    app = create_app()
+    app.config.update({"TESTING": True, "REPLICA_LAG_CHECK_SECONDS": 0})
+    replica = app.extensions["replica_engine"]
+
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(replica)
+
+        db.session.add(
+            Trade(
+                trade_date=date(2025, 1, 15),
+                account="PRIMARY_ACC",
+                ticker="AAPL",
+                quantity=100,
+                price=150.00,
+            )
+        )
+        db.session.commit()
+
+        with replica.begin() as conn:
+            conn.execute(
+                Trade.__table__.insert().values(
+                    trade_date=date(2025, 1, 15),
+                    account="REPLICA_ACC",
+                    ticker="AAPL",
+                    quantity=100,
+                    price=150.00,
+                )
+            )
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+    replica.dispose()
+
+
+def test_read_endpoints_use_replica(replica_app):
+    client = replica_app.test_client()
+
+    blotter = client.get("/blotter?date=2025-01-15").json
+    positions = client.get("/positions?date=2025-01-15").json
+
+    assert [t["account"] for t in blotter] == ["REPLICA_ACC"]
+    assert list(positions) == ["REPLICA_ACC"]
+
+
+def test_lagging_replica_falls_back_to_primary(replica_app, monkeypatch):
+    monitor = replica_app.extensions["replica_monitor"]
+    monkeypatch.setattr(monitor, "measure_lag", lambda engine: 120.0)
+    client = replica_app.test_client()
+
+    blotter = client.get("/blotter?date=2025-01-15").json
+
+    assert [t["account"] for t in blotter] == ["PRIMARY_ACC"]
+    assert monitor.lag == 120.0
+
+
+def test_writes_outside_read_views_use_primary(replica_app):
+    with replica_app.app_context():
+        assert db.session.get_bind() is db.engines[None]
+
+
+def test_replica_leaves_no_state_on_shared_db(replica_app):
+    assert list(db.metadatas) == [None]
+
+
+def test_health_check_in_flight_returns_cached_value(replica_app, monkeypatch):
+    """Requests don't queue behind a slow lag check; they use the last result."""
+    monitor = replica_app.extensions["replica_monitor"]
+
+    def unreachable(engine):
+        raise AssertionError("lag check must not run while another is in flight")
+
+    monkeypatch.setattr(monitor, "measure_lag", unreachable)
+    with monitor._lock:
+        blotter = replica_app.test_client().get("/blotter?date=2025-01-15").json
+
+    assert [t["account"] for t in blotter] == ["PRIMARY_ACC"]
+
+
+def test_engine_options_for_postgres(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("REPLICA_STATEMENT_TIMEOUT_MS", "5000")
+
+    options = engine_options(
+        "postgresql+psycopg://user:pw@replica/db", "REPLICA", fallback="DB"
+    )
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 10
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_replica_connect_timeout_default():
+    options = engine_options(
+        "postgresql+psycopg://user:pw@replica/db", "REPLICA", connect_timeout=2
+    )
+
+    assert options["connect_args"] == {"connect_timeout": 2}
+
+
+def test_engine_options_for_sqlite_skip_pool_sizing():
+    options = engine_options("sqlite:///local.db", "DB")
+
+    assert "pool_size" not in options
+    assert "connect_args" not in options
@@ -0,0 +1,193 @@
+import threading
+import time
+import pytest
+from datetime import date
+from app import db, events, routes
+from app.events import AlertBroker, publish_committed_alerts
+from app.models import Trade, ComplianceAlert
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Fresh small broker shared by the ingest side and the stream view."""
+    fresh = AlertBroker(capacity=2)
+    monkeypatch.setattr(events, "broker", fresh)
+    monkeypatch.setattr(routes, "broker", fresh)
+    return fresh
+
+
+def seed_alert(app, ticker="MEME"):
+    with app.app_context():
+        t1 = Trade(
+            trade_date=date(2025, 4, 1),
+            account="RISKY_ACC",
+            ticker=ticker,
+            quantity=1000,
+            price=10.00,
+        )
+        db.session.add(t1)
+        db.session.flush()
+
+        alert = ComplianceAlert(
+            trade_id=t1.id,
+            rule_name="Basket Concentration (>20%)",
+            severity="WARNING",
+            description=f"Ticker {ticker} is 100% of basket",
+        )
+        db.session.add(alert)
+        db.session.commit()
+        return alert.id
+
+
+def open_stream(client, url):
+    response = client.get(url, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return response, iter(response.response)
+
+
+def test_broker_returns_only_newer_events():
+    b = AlertBroker(capacity=10)
+    b.publish([{"id": 1}, {"id": 2}])
+
+    assert [e["id"] for e in b.wait_for(1, timeout=0)[0]] == [2]
+    assert b.wait_for(2, timeout=0) == ([], False)
+
+
+def test_broker_drops_stale_publishes():
+    b = AlertBroker(capacity=10)
+    b.publish([{"id": 5}])
+    b.publish([{"id": 3}])
+
+    assert [e["id"] for e in b.wait_for(0, timeout=0)[0]] == [5]
+
+
+def test_broker_reports_gap_after_eviction():
+    b = AlertBroker(capacity=3)
+    b.publish([{"id": i} for i in range(1, 8)])
+
+    assert b.wait_for(0, timeout=0) == ([], True)
+    assert b.wait_for(3, timeout=0) == ([], True)
+    events, gap = b.wait_for(4, timeout=0)
+    assert [e["id"] for e in events] == [5, 6, 7]
+    assert gap is False
+
+
+def test_stream_invalid_last_id(client):
+    response = client.get("/alarms/stream?last_id=abc")
+    assert response.status_code == 400
+    assert "Invalid last_id" in response.json["error"]
+
+
+def test_stream_resumes_from_last_id(client, app):
+    first_id = seed_alert(app, "AAA")
+    second_id = seed_alert(app, "BBB")
+
+    response, chunks = open_stream(client, f"/alarms/stream?last_id={first_id}")
+    assert next(chunks).startswith(b"retry:")
+
+    event = next(chunks).decode()
+    assert f"id: {second_id}\n" in event
+    assert '"ticker": "BBB"' in event
+    response.close()
+
+
+def test_stream_pushes_published_alerts(client, app, broker):
+    app.config["SSE_HEARTBEAT_SECONDS"] = 0.01
+    seed_alert(app, "OLD")
+
+    response, chunks = open_stream(client, "/alarms/stream")
+    next(chunks)
+    assert next(chunks) == b": keep-alive\n\n"
+
+    new_id = seed_alert(app, "NEW")
+    with app.app_context():
+        publish_committed_alerts(
+            [{"id": new_id, "ticker": "NEW", "account": "RISKY_ACC"}]
+        )
+
+    while (chunk := next(chunks)) == b": keep-alive\n\n":
+        pass
+    assert f"id: {new_id}\n".encode() in chunk
+    assert broker.latest_id == new_id
+    response.close()
+
+
+def read_events(chunks, count):
+    ids = []
+    while len(ids) < count:
+        chunk = next(chunks).decode()
+        if chunk.startswith("id: "):
+            ids.append(int(chunk.split("\n", 1)[0][4:]))
+    return ids
+
+
+def test_stream_backfills_alerts_evicted_from_buffer(client, app, broker):
+    """More alerts than the buffer holds are re-read from the database."""
+    app.config["SSE_HEARTBEAT_SECONDS"] = 0.01
+    response, chunks = open_stream(client, "/alarms/stream")
+    next(chunks)
+
+    alert_ids = [seed_alert(app, f"T{i}") for i in range(5)]
+    with app.app_context():
+        publish_committed_alerts([{"id": i} for i in alert_ids])
+
+    assert broker.wait_for(0, timeout=0) == ([], True)
+    assert read_events(chunks, 5) == alert_ids
+    response.close()
+
+
+def test_stream_pages_backlog(client, app):
+    app.config["SSE_BACKLOG_PAGE_SIZE"] = 2
+    alert_ids = [seed_alert(app, f"T{i}") for i in range(5)]
+
+    response, chunks = open_stream(client, "/alarms/stream?last_id=0")
+    next(chunks)
+
+    assert read_events(chunks, 5) == alert_ids
+    response.close()
+
+
+def test_stream_rejects_subscribers_over_limit(client, app, broker):
+    app.config["SSE_MAX_SUBSCRIBERS"] = 1
+
+    first, _ = open_stream(client, "/alarms/stream")
+    second = client.get("/alarms/stream", buffered=False)
+
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "30"
+    assert broker.subscribers == 1
+
+    first.close()
+    assert broker.subscribers == 0
+
+
+def test_broker_fans_out_to_supported_subscriber_count(app):
+    """
+    The default SSE_MAX_SUBSCRIBERS idle subscribers each get a single
+    publish promptly, and parking them costs no database work.
+    """
+    b = AlertBroker(capacity=10)
+    count = app.config["SSE_MAX_SUBSCRIBERS"]
+    received = []
+    ready = threading.Barrier(count + 1)
+
+    def subscriber():
+        assert b.subscribe(count)
+        ready.wait()
+        events, _ = b.wait_for(0, timeout=10)
+        received.append(len(events))
+
+    threads = [threading.Thread(target=subscriber) for _ in range(count)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    assert not b.subscribe(count)
+
+    started = time.monotonic()
+    b.publish([{"id": 1}])
+    for t in threads:
+        t.join(timeout=10)
+
+    assert received == [1] * count
+    assert time.monotonic() - started < 5